@@ -5,37 +5,49 @@ import os
 import sys
 import json
 import time
-import threading
+import asyncio
+import socket # Для кеширования getaddrinfo
+import functools # Для lru_cache поверх getaddrinfo
 import ipaddress # Используем для более надежной проверки приватных IP
 import subprocess # Для выполнения команды ping
 import re # Для извлечения времени пинга
 import platform # Для определения ОС для команды ping
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from collections import namedtuple
 
 # Попытка импортировать зависимости
 try:
-    import requests
+    import aiohttp
     from colorama import init, Fore, Style
 except ImportError:
     print("Ошибка: Не найдены необходимые библиотеки.")
     print("Пожалуйста, установите их, выполнив команду в терминале:")
-    print("pip3 install requests colorama")
-    # Или: python3 -m pip install requests colorama
+    print("pip3 install aiohttp colorama")
+    # Или: python3 -m pip install aiohttp colorama
     sys.exit(1)
 
+# icmplib — опциональная зависимость: ICMP-пинг без запуска внешней команды ping
+# (без fork/exec на каждый прокси). Если не установлена, используется системный ping.
+try:
+    from icmplib import async_ping as icmp_async_ping
+except ImportError:
+    icmp_async_ping = None
+
 # --- Константы ---
 CONFIG_FILE = Path("config.json")
 DEFAULT_CONFIG = {
-    "thread": 50,
+    # Базовый уровень параллелизма (одновременных проверок = thread * 20).
+    # Проверка прокси — чистый сетевой I/O, так что значение можно смело поднимать
+    "thread": 200,
     "timeout": 10, # Таймаут для HTTP-запросов (сек)
     "max_ms": 5000, # Макс. задержка ответа хоста (мс) для попадания в good_proxies.txt
     "import": ["proxies.txt"],
     "export": "good_proxies.txt",
     # URL для проверки доступности и первоначальной задержки через прокси
     "host_check_url": "https://www.google.com",
-    # URL для проверки IP-адреса, видимого через прокси
-    "ip_check_url": "https://api.ipify.org?format=json",
+    # URL для проверки IP-адреса, видимого через прокси (отдает IP простым текстом)
+    "ip_check_url": "https://api.ipify.org",
     # --- Новые параметры ---
     "enable_ping": True, # Включить проверку пинга до IP прокси?
     "ping_timeout_ms": 1000, # Таймаут для одного пакета пинга (мс)
@@ -43,14 +55,53 @@ DEFAULT_CONFIG = {
     # URL для скачивания тестового файла (выберите стабильный источник)
     "speed_test_url": "http://speedtest.tele2.net/1MB.zip",
     # Минимальная скорость (KB/s) для вывода зеленым цветом (информативно, не влияет на запись в файл)
-    "speed_min_good_kbps": 100
+    "speed_min_good_kbps": 100,
+    # Проверять TLS-сертификаты целевых хостов? False заметно дешевле по CPU на
+    # рукопожатие, но ослабляет обнаружение MITM (проверка совпадения IP остается)
+    "verify_tls": False
 }
 
-# --- Глобальные переменные и блокировки ---
-checked_count = 0
-proxies_length = 0
+# Предвычисленные ANSI-коды для горячего пути логирования (без повторных
+# обращений к атрибутам colorama на каждый прокси)
+_RESET = Style.RESET_ALL
+_WHITE = Fore.WHITE
+_RED = Fore.RED
+_GREEN = Fore.GREEN
+_YELLOW = Fore.YELLOW
+
+# Предкомпилированные шаблоны для разбора вывода ping (байтовые — stdout не декодируем)
+_RE_PING_TIME = re.compile(rb"time[=<]([\d.]+)\s?ms", re.IGNORECASE)
+_RE_PING_AVG = re.compile(rb"rtt min/avg/max/mdev = [\d.]+/([\d.]+)/") # Linux
+_RE_PING_ROUND_TRIP = re.compile(rb"round-trip min/avg/max/stddev = [\d.]+/([\d.]+)/") # macOS?
+
+# --- Глобальные переменные ---
+# Счетчики на itertools.count: next() атомарен под GIL, так что инкременты
+# корректны даже без блокировок и вне потока цикла событий
+_checked_counter = count(1)
+_good_counter = count(1)
+checked_count = 0 # Последние выданные значения (для заголовка и финальной статистики)
 good_proxies_count = 0
-lock = threading.Lock()
+proxies_length = 0
+
+# Буфер рабочих прокси: пишем в файл экспорта пачками, а не open/write на каждый успех
+_export_buffer = []
+_EXPORT_FLUSH_EVERY = 100
+
+# Заголовок окна обновляем не чаще ~10 раз в секунду, а не на каждый прокси
+_last_title_ts = 0.0
+_TITLE_UPDATE_INTERVAL_SEC = 0.1
+
+# Тест скорости: столько байт за >= 1 сек достаточно для надежной оценки,
+# скачивать тестовый файл целиком незачем
+_SPEED_TEST_MAX_BYTES = 200 * 1024
+_SPEED_TEST_MIN_SEC = 1.0
+
+# Таймаут дешевого TCP-фильтра до самого прокси (сек)
+_TCP_PROBE_TIMEOUT_SEC = 2.0
+
+# Предразобранный прокси: вся работа со строками делается один раз при старте,
+# а не в горячем пути каждой проверки
+ProxyEntry = namedtuple('ProxyEntry', 'raw ip port url is_private')
 
 # --- Функции ---
 
@@ -92,27 +143,92 @@ def load_proxies(import_files):
     for file_path_str in import_files:
         file_path = Path(file_path_str)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    cleaned_line = line.strip()
-                    if cleaned_line and ':' in cleaned_line: # Простая проверка формата
-                        proxies.add(cleaned_line)
+            # Читаем файл целиком одним syscall и разбираем на скорости C,
+            # вместо построчного цикла в байткоде Python
+            data = file_path.read_bytes().decode('utf-8', 'ignore')
+            proxies.update(line for line in map(str.strip, data.split('\n'))
+                           if line and ':' in line) # Простая проверка формата
         except FileNotFoundError:
             print(f"{Fore.RED}Ошибка: Файл для импорта '{file_path}' не найден.{Style.RESET_ALL}")
         except IOError as e:
             print(f"{Fore.RED}Ошибка при чтении файла '{file_path}': {e}{Style.RESET_ALL}")
+    if len(proxies) > 1000:
+        recommended = max(200, min(len(proxies) // 10, 1000))
+        print(f"{Fore.YELLOW}Подсказка: для {len(proxies)} прокси имеет смысл установить thread = {recommended} в {CONFIG_FILE}.{Style.RESET_ALL}")
     return list(proxies) # Возвращаем список
 
+def install_getaddrinfo_cache(maxsize=4096):
+    """Оборачивает socket.getaddrinfo в LRU-кеш.
+
+    Целевые хосты (ipify, host_check_url) фиксированы, а адреса прокси — уже
+    числовые IP, так что повторные походы в системный резолвер (NSS,
+    /etc/hosts, resolv.conf) на каждый запрос не нужны.
+    """
+    socket.getaddrinfo = functools.lru_cache(maxsize=maxsize)(socket.getaddrinfo)
+
+def raise_fd_limit(min_limit):
+    """Поднимает мягкий лимит открытых файлов (POSIX), чтобы хватило дескрипторов на все соединения."""
+    try:
+        import resource
+    except ImportError: # Windows
+        return
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < min_limit:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(min_limit, hard), hard))
+    except (ValueError, OSError):
+        pass # Не вышло — семафор все равно ограничит число одновременных соединений
+
+def flush_export_buffer(export_file_path):
+    """Дописывает накопленные рабочие прокси в файл экспорта одним вызовом."""
+    if not _export_buffer:
+        return
+    try:
+        with open(export_file_path, 'a', encoding='utf-8') as export_f:
+            export_f.writelines(f'{proxy}\n' for proxy in _export_buffer)
+    except IOError as e:
+        print(f"{Fore.RED}Ошибка записи в файл {export_file_path}: {e}{Style.RESET_ALL}")
+    _export_buffer.clear()
+
 def is_private_ip(ip_str):
     """Проверяет, является ли IP-адрес приватным (RFC 1918) или локальным."""
+    if ':' in ip_str: # IPv6 — редкий случай, оставляем точную проверку через ipaddress
+        try:
+            ip_obj = ipaddress.ip_address(ip_str)
+            return ip_obj.is_private or ip_obj.is_loopback
+        except ValueError:
+            return False
+    # IPv4: сравнение префиксов по октетам, без аллокации объекта IPv4Address
     try:
-        ip_obj = ipaddress.ip_address(ip_str)
-        return ip_obj.is_private or ip_obj.is_loopback
+        a, b, _, _ = map(int, ip_str.split('.', 3))
     except ValueError:
         return False
+    return (a == 10 or a == 127 or a == 0
+            or (a == 172 and 16 <= b <= 31)
+            or (a == 192 and b == 168)
+            or (a == 169 and b == 254))
+
+def parse_proxy(proxy_str):
+    """Разбирает строку IP:PORT в ProxyEntry или возвращает None при некорректном формате."""
+    proxy_ip, sep, proxy_port = proxy_str.partition(':')
+    if not sep or not proxy_ip or not proxy_port.isdigit() or not (0 < int(proxy_port) < 65536):
+        return None
+    return ProxyEntry(proxy_str, proxy_ip, int(proxy_port),
+                      f'http://{proxy_str}', is_private_ip(proxy_ip))
+
+async def ping_host_icmp(ip_address, timeout_ms=1000):
+    """Пингует IP-адрес через ICMP-сокет и возвращает задержку в мс или None."""
+    try:
+        # privileged=False использует SOCK_DGRAM — root не нужен (на Linux при
+        # настроенном net.ipv4.ping_group_range)
+        host = await icmp_async_ping(ip_address, count=1, timeout=timeout_ms / 1000.0, privileged=False)
+        return round(host.avg_rtt) if host.is_alive else None
+    except Exception:
+        # Нет прав на ICMP-сокет или некорректный адрес
+        return None
 
 def ping_host(ip_address, timeout_ms=1000):
-    """Пингует IP-адрес и возвращает задержку в мс или None при ошибке/таймауте."""
+    """Пингует IP-адрес системной командой ping (резерв, если icmplib не установлена)."""
     try:
         timeout_sec = timeout_ms / 1000.0
         current_os = platform.system().lower()
@@ -129,17 +245,18 @@ def ping_host(ip_address, timeout_ms=1000):
             startupinfo = None
             creationflags = 0
 
-        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout_sec + 0.5,
+        # text=False: ищем по байтам предкомпилированными шаблонами, без декодирования stdout
+        result = subprocess.run(command, capture_output=True, timeout=timeout_sec + 0.5,
                                 startupinfo=startupinfo, creationflags=creationflags, check=False) # check=False чтобы не вызывать исключение при returncode != 0
 
         if result.returncode == 0:
-            match = re.search(r"time[=<]([\d.]+)\s?ms", result.stdout, re.IGNORECASE)
+            match = _RE_PING_TIME.search(result.stdout)
             if match:
                 return int(float(match.group(1)))
-            match_avg = re.search(r"rtt min/avg/max/mdev = [\d.]+/([\d.]+)/", result.stdout) # Linux
+            match_avg = _RE_PING_AVG.search(result.stdout)
             if match_avg:
                  return int(float(match_avg.group(1)))
-            match_round_trip = re.search(r"round-trip min/avg/max/stddev = [\d.]+/([\d.]+)/", result.stdout) # macOS?
+            match_round_trip = _RE_PING_ROUND_TRIP.search(result.stdout)
             if match_round_trip:
                  return int(float(match_round_trip.group(1)))
             # Если ничего не нашли, но код возврата 0 (успех), вернем 0 мс? Или None?
@@ -159,19 +276,24 @@ def ping_host(ip_address, timeout_ms=1000):
         # print(f"Ошибка при выполнении ping для {ip_address}: {e}") # Отладка
         return None
 
-def test_download_speed(proxy_dict, url, timeout_sec=10):
+async def test_download_speed(session, proxy_url, url, timeout_sec=10, ssl_arg=None):
     """Скачивает файл через прокси и возвращает скорость в KB/s или None."""
     start_time = time.time()
     bytes_downloaded = 0
     try:
-        with requests.get(url, proxies=proxy_dict, stream=True, timeout=timeout_sec) as response:
+        timeout = aiohttp.ClientTimeout(total=timeout_sec)
+        async with session.get(url, proxy=proxy_url, timeout=timeout, ssl=ssl_arg) as response:
             response.raise_for_status() # Проверяем HTTP ошибки
-            for chunk in response.iter_content(chunk_size=8192): # 8KB chunk
+            async for chunk in response.content.iter_chunked(8192): # 8KB chunk
                 bytes_downloaded += len(chunk)
+                elapsed = time.time() - start_time
                 # Добавим проверку таймаута внутри цикла скачивания
-                if time.time() - start_time > timeout_sec:
-                    raise requests.exceptions.Timeout("Download timeout during streaming")
-            end_time = time.time()
+                if elapsed > timeout_sec:
+                    raise asyncio.TimeoutError("Download timeout during streaming")
+                # Ранний выход: выборки уже достаточно, скорость считаем по скачанному
+                if bytes_downloaded >= _SPEED_TEST_MAX_BYTES and elapsed >= _SPEED_TEST_MIN_SEC:
+                    break
+        end_time = time.time()
 
         duration = end_time - start_time
         if duration > 0.001 and bytes_downloaded > 0: # Избегаем деления на ноль или около нуля
@@ -180,38 +302,31 @@ def test_download_speed(proxy_dict, url, timeout_sec=10):
         else:
             return 0 # Скачали 0 байт или время слишком мало
 
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         return None
-    except requests.exceptions.RequestException as e:
+    except aiohttp.ClientError:
         return None
     except Exception as e:
-        # print(f"Ошибка при тесте скорости для {proxy_dict}: {e}") # Отладка
+        # print(f"Ошибка при тесте скорости для {proxy_url}: {e}") # Отладка
         return None
 
-def check_proxy(proxy_str, config, export_file_path):
-    """Проверяет один прокси: IP, доступность, пинг, скорость."""
-    # --- ИСПРАВЛЕНИЕ: Объявляем глобальные переменные в начале функции ---
-    global checked_count, good_proxies_count
-    # -------------------------------------------------------------------
+async def check_proxy(entry, config, export_file_path, session):
+    """Проверяет один прокси (ProxyEntry): IP, доступность, пинг, скорость."""
+    global checked_count, good_proxies_count, _last_title_ts
 
-    log_prefix = f"{Fore.WHITE}{proxy_str}{Style.RESET_ALL} |" # Начинаем с белого
-    result_message = ""
-    status_color = Fore.RED # По умолчанию - ошибка
+    # Строка уже разобрана в parse_proxy — здесь только сетевая работа
+    proxy_ip = entry.ip
+    proxy_url = entry.url # URL прокси для aiohttp (proxy= принимает строку вида http://ip:port)
+    proxy_is_private = entry.is_private
 
-    try:
-        proxy_ip, proxy_port = proxy_str.split(':', 1)
-        if not proxy_port.isdigit() or not (0 < int(proxy_port) < 65536):
-            result_message = "Некорректный порт"
-            raise ValueError("Invalid port") # Используем исключение для выхода в finally
-    except ValueError:
-        print(f"{log_prefix} {Fore.RED}{result_message or 'Некорректный формат (ожидается IP:PORT)'}{Style.RESET_ALL}")
-        return # Выход из функции, не считаем как проверенный по сети
+    log_prefix = f"{_WHITE}{entry.raw}{_RESET} |" # Начинаем с белого
+    result_message = ""
+    status_color = _RED # По умолчанию - ошибка
 
-    # Формируем словарь для requests
-    proxies_dict = {'http': f'http://{proxy_str}', 'https': f'http://{proxy_str}'}
     timeout_http = config['timeout']
     max_ms_host = config['max_ms']
-    proxy_is_private = is_private_ip(proxy_ip)
+    # ssl=False отключает проверку сертификатов, ssl=None — поведение по умолчанию
+    ssl_arg = None if config['verify_tls'] else False
 
     ping_result_ms = None
     speed_result_kbps = None
@@ -219,103 +334,160 @@ def check_proxy(proxy_str, config, export_file_path):
     is_good = False # Флаг, что прокси прошел базовые проверки
 
     try:
-        # 1. Проверка IP (если не приватный)
+        # 0. Дешевый фильтр: пробуем TCP-соединение до самого прокси. Мертвые
+        # прокси (обычно большинство списка) отсеиваются за <= 2 сек вместо
+        # полного HTTP-таймаута, без затрат на TLS-рукопожатие
+        try:
+            _, probe_writer = await asyncio.wait_for(
+                asyncio.open_connection(proxy_ip, entry.port),
+                timeout=_TCP_PROBE_TIMEOUT_SEC)
+            probe_writer.close()
+            await probe_writer.wait_closed()
+        except (OSError, asyncio.TimeoutError):
+            result_message = "TCP-соединение с прокси не удалось"
+            raise ValueError("TCP connect failed")
+
+        # 1. Проверка IP и задержки одним запросом: ответ ipify одновременно
+        # подтверждает сквозную доступность через прокси и возвращает внешний IP
         if not proxy_is_private:
             try:
-                response_ip = requests.get(config['ip_check_url'], proxies=proxies_dict, timeout=timeout_http)
-                response_ip.raise_for_status()
-                seen_ip = response_ip.json()['ip']
+                start_time = time.perf_counter()
+                async with session.get(config['ip_check_url'], proxy=proxy_url, ssl=ssl_arg) as response_ip:
+                    response_ip.raise_for_status()
+                    # ipify без ?format=json отдает голый IP — парсер JSON не нужен
+                    seen_ip = (await response_ip.text()).strip()
+                if seen_ip.startswith('{'):
+                    # Совместимость со старыми config.json, где URL еще с ?format=json
+                    try:
+                        seen_ip = json.loads(seen_ip)['ip']
+                    except (json.JSONDecodeError, KeyError):
+                        result_message = "Ошибка проверки IP: неожиданный ответ сервиса"
+                        raise ValueError("IP check bad response")
+                end_time = time.perf_counter()
+                host_latency_ms = round((end_time - start_time) * 1000)
                 if seen_ip != proxy_ip:
                     result_message = f"IP не совпадает (ожидался {proxy_ip}, получен {seen_ip})"
                     raise ValueError("IP mismatch") # Выход из блока try
-            except requests.exceptions.Timeout:
+            except asyncio.TimeoutError:
                 result_message = f"Тайм-аут при проверке IP ({config['ip_check_url']})"
                 raise ValueError("IP check timeout")
-            except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+            except aiohttp.ClientError as e:
                 result_message = f"Ошибка проверки IP: {type(e).__name__}"
                 raise ValueError("IP check error")
-
-        # 2. Проверка доступности хоста и задержки
-        try:
-            start_time = time.perf_counter()
-            response_host = requests.head(config['host_check_url'], proxies=proxies_dict, timeout=timeout_http, allow_redirects=True)
-            response_host.raise_for_status()
-            end_time = time.perf_counter()
-            host_latency_ms = round((end_time - start_time) * 1000)
-        except requests.exceptions.Timeout:
-            result_message = f"Тайм-аут при проверке хоста ({config['host_check_url']})"
-            raise ValueError("Host check timeout")
-        except requests.exceptions.RequestException as e:
-            status_code_info = ""
-            if hasattr(e, 'response') and e.response is not None:
-                status_code_info = f" (Статус: {e.response.status_code})"
-            result_message = f"Ошибка проверки хоста: {type(e).__name__}{status_code_info}"
-            raise ValueError("Host check error")
+        else:
+            # 2. Для приватных прокси внешний IP не проверить — меряем задержку
+            # отдельным запросом к host_check_url
+            try:
+                start_time = time.perf_counter()
+                # Редиректы не следуем: ответ 2xx/3xx сам по себе подтверждает,
+                # что прокси работает, а цепочка 3xx может вылиться в скачивание
+                # целых страниц; контекстный менеджер вернет соединение в пул
+                async with session.head(config['host_check_url'], proxy=proxy_url, allow_redirects=False, ssl=ssl_arg) as response_host:
+                    response_host.raise_for_status()
+                end_time = time.perf_counter()
+                host_latency_ms = round((end_time - start_time) * 1000)
+            except asyncio.TimeoutError:
+                result_message = f"Тайм-аут при проверке хоста ({config['host_check_url']})"
+                raise ValueError("Host check timeout")
+            except aiohttp.ClientError as e:
+                status_code_info = ""
+                if isinstance(e, aiohttp.ClientResponseError):
+                    status_code_info = f" (Статус: {e.status})"
+                result_message = f"Ошибка проверки хоста: {type(e).__name__}{status_code_info}"
+                raise ValueError("Host check error")
 
         # --- Если дошли сюда, базовая проверка хоста пройдена ---
         is_good = True # Прокси как минимум отвечает
 
         # 3. Пинг (если включен)
         if config['enable_ping']:
-            ping_result_ms = ping_host(proxy_ip, config['ping_timeout_ms'])
+            if icmp_async_ping is not None:
+                ping_result_ms = await ping_host_icmp(proxy_ip, config['ping_timeout_ms'])
+            else:
+                # Блокирующий subprocess выносим из цикла событий
+                ping_result_ms = await asyncio.to_thread(ping_host, proxy_ip, config['ping_timeout_ms'])
 
-        # 4. Тест скорости (если включен)
-        if config['enable_speed_test']:
+        # 4. Тест скорости (если включен) — только для кандидатов, прошедших
+        # критерий max_ms: качать тестовый файл через заведомо медленный прокси
+        # значит впустую тратить время и трафик
+        if config['enable_speed_test'] and host_latency_ms is not None and host_latency_ms < max_ms_host:
             speed_timeout = max(timeout_http, 15) # Например, минимум 15 сек на скачивание
-            speed_result_kbps = test_download_speed(proxies_dict, config['speed_test_url'], timeout_sec=speed_timeout)
+            speed_result_kbps = await test_download_speed(session, proxy_url, config['speed_test_url'], timeout_sec=speed_timeout, ssl_arg=ssl_arg)
 
         # --- Формирование итогового сообщения и статуса ---
         status_parts = []
         if host_latency_ms is not None:
             if host_latency_ms < max_ms_host:
-                 status_parts.append(f"{Fore.GREEN}{host_latency_ms}ms{Style.RESET_ALL}")
-                 status_color = Fore.GREEN # Основной критерий пройден
+                 status_parts.append(f"{_GREEN}{host_latency_ms}ms{_RESET}")
+                 status_color = _GREEN # Основной критерий пройден
             else:
-                 status_parts.append(f"{Fore.YELLOW}{host_latency_ms}ms{Style.RESET_ALL}")
-                 status_color = Fore.YELLOW # Медленный, но рабочий
+                 status_parts.append(f"{_YELLOW}{host_latency_ms}ms{_RESET}")
+                 status_color = _YELLOW # Медленный, но рабочий
 
         if ping_result_ms is not None:
             status_parts.append(f"Ping: {ping_result_ms}ms")
         elif config['enable_ping']:
-            status_parts.append(f"{Fore.YELLOW}Ping: N/A{Style.RESET_ALL}") # Если пинг был включен, но не удался
+            status_parts.append(f"{_YELLOW}Ping: N/A{_RESET}") # Если пинг был включен, но не удался
 
         if speed_result_kbps is not None:
-             speed_color = Fore.GREEN if speed_result_kbps >= config['speed_min_good_kbps'] else Fore.YELLOW
-             status_parts.append(f"Speed: {speed_color}{speed_result_kbps} KB/s{Style.RESET_ALL}")
-        elif config['enable_speed_test']:
-             status_parts.append(f"{Fore.YELLOW}Speed: N/A{Style.RESET_ALL}") # Если тест был включен, но не удался
+             speed_color = _GREEN if speed_result_kbps >= config['speed_min_good_kbps'] else _YELLOW
+             status_parts.append(f"Speed: {speed_color}{speed_result_kbps} KB/s{_RESET}")
+        elif config['enable_speed_test'] and host_latency_ms is not None and host_latency_ms < max_ms_host:
+             status_parts.append(f"{_YELLOW}Speed: N/A{_RESET}") # Если тест запускался, но не удался
 
         result_message = " | ".join(filter(None, status_parts)) # Собираем части сообщения
 
         # Запись в файл только если основной критерий (host_latency_ms < max_ms_host) выполнен
-        if status_color == Fore.GREEN:
-            with lock:
-                try:
-                    with open(export_file_path, 'a', encoding='utf-8') as export_f:
-                        export_f.write(f'{proxy_str}\n')
-                    good_proxies_count += 1 # Инкрементируем глобальную переменную
-                except IOError as e:
-                     print(f"{Fore.RED}Ошибка записи в файл {export_file_path}: {e}{Style.RESET_ALL}")
+        if status_color == _GREEN:
+            _export_buffer.append(entry.raw)
+            good_proxies_count = next(_good_counter)
+            if len(_export_buffer) >= _EXPORT_FLUSH_EVERY:
+                flush_export_buffer(export_file_path)
 
 
     except Exception as e:
         if not result_message: # Если сообщение не было установлено ранее
              result_message = f"Непредвиденная ошибка: {type(e).__name__} {e}"
-        status_color = Fore.RED
+        status_color = _RED
         is_good = False
 
     finally:
-        # Выводим итоговый лог для этого прокси
-        print(f"{log_prefix} {status_color}{result_message}{Style.RESET_ALL}")
-
-        # Обновляем счетчик обработанных и заголовок окна
-        with lock:
-            checked_count += 1 # Инкрементируем глобальную переменную
-            # Чтение good_proxies_count здесь безопасно
+        # Выводим итоговый лог для этого прокси одним write вместо сборки f-строки в print
+        sys.stdout.write(''.join((log_prefix, ' ', status_color, result_message, _RESET, '\n')))
+
+        # Обновляем счетчик обработанных и заголовок окна (с троттлингом,
+        # чтобы не дергать терминал на каждый прокси)
+        checked_count = next(_checked_counter)
+        now = time.monotonic()
+        if now - _last_title_ts > _TITLE_UPDATE_INTERVAL_SEC or checked_count == proxies_length:
+            _last_title_ts = now
             title = f"Proxy Checker | Обработано: {checked_count}/{proxies_length} | Рабочих: {good_proxies_count}"
             sys.stdout.write(f"\x1b]2;{title}\x07")
             sys.stdout.flush()
 
+async def check_worker(entry_iter, config, export_file, session):
+    """Корутина-воркер: разбирает прокси из общего итератора, пока он не опустеет."""
+    for entry in entry_iter:
+        await check_proxy(entry, config, export_file, session)
+
+async def run_checks(entries, config, export_file):
+    """Запускает проверку всех прокси (список ProxyEntry) в цикле событий asyncio."""
+    # Фиксированный пул корутин-воркеров вместо gather по всему списку сразу:
+    # бухгалтерия задач занимает O(воркеров), а не O(прокси), и сам размер пула
+    # ограничивает параллелизм — отдельный семафор не нужен
+    concurrency = min(config['thread'] * 20, len(entries))
+    # Общая сессия: соединения к каждому прокси и DNS-ответы кешируются в пуле коннектора,
+    # вместо нового TCP/TLS-рукопожатия на каждый запрос
+    timeout = aiohttp.ClientTimeout(total=config['timeout'])
+    connector = aiohttp.TCPConnector(limit=config['thread'] * 20, limit_per_host=0)
+    # Итератор общий: воркеры кооперативно берут из него по одному прокси
+    entry_iter = iter(entries)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        await asyncio.gather(*(check_worker(entry_iter, config, export_file, session)
+                               for _ in range(concurrency)))
+    # Сбрасываем остаток буфера после завершения всех проверок
+    flush_export_buffer(export_file)
+
 # --- Основная часть скрипта ---
 if __name__ == "__main__":
 
@@ -348,6 +520,7 @@ ___________ _______   ____   __  _____  _   _  _____ _____  _   __ ___________
     print(f"    Файл экспорта: {config['export']}")
     print(f"    URL проверки хоста: {config['host_check_url']}")
     print(f"    URL проверки IP: {config['ip_check_url']}")
+    print(f"    Проверка TLS-сертификатов: {'Да' if config['verify_tls'] else 'Нет'}")
     print(f"    Пинг включен: {'Да' if config['enable_ping'] else 'Нет'}")
     if config['enable_ping']:
         print(f"      Тайм-аут пинга (мс): {config['ping_timeout_ms']}")
@@ -360,7 +533,16 @@ ___________ _______   ____   __  _____  _   _  _____ _____  _   __ ___________
     # Загрузка прокси
     print(Fore.YELLOW + "Загрузка списка прокси..." + Style.RESET_ALL)
     proxies = load_proxies(config['import'])
-    proxies_length = len(proxies)
+
+    # Предразбор: некорректные строки отсеиваем сразу, до запуска проверок
+    entries = []
+    for proxy_str in proxies:
+        entry = parse_proxy(proxy_str)
+        if entry is None:
+            print(f"{Fore.WHITE}{proxy_str}{Style.RESET_ALL} | {Fore.RED}Некорректный формат (ожидается IP:PORT){Style.RESET_ALL}")
+        else:
+            entries.append(entry)
+    proxies_length = len(entries)
 
     if proxies_length == 0:
         print(Fore.RED + "Ошибка: Не найдено ни одного прокси для проверки." + Style.RESET_ALL)
@@ -377,17 +559,18 @@ ___________ _______   ____   __  _____  _   _  _____ _____  _   __ ___________
         sys.exit(1)
 
     # Запуск проверки
-    print(Fore.CYAN + f"Начинаю проверку {proxies_length} прокси в {config['thread']} потоков..." + Style.RESET_ALL)
+    print(Fore.CYAN + f"Начинаю проверку {proxies_length} прокси (до {config['thread'] * 20} одновременных соединений)..." + Style.RESET_ALL)
     start_run_time = time.time()
     initial_title = f"Proxy Checker | Проверка 0/{proxies_length} | Рабочих: 0"
     sys.stdout.write(f"\x1b]2;{initial_title}\x07")
     sys.stdout.flush()
 
-    # Создаем пул потоков
-    with ThreadPoolExecutor(max_workers=config['thread']) as executor:
-        futures = [executor.submit(check_proxy, proxy, config, export_file) for proxy in proxies]
+    # Запускаем цикл событий asyncio (предварительно подняв лимит дескрипторов
+    # и включив кеш DNS-резолвера)
+    install_getaddrinfo_cache()
+    raise_fd_limit(config['thread'] * 20 + 64)
+    asyncio.run(run_checks(entries, config, export_file))
 
-    # Завершение (shutdown по умолчанию ждет завершения всех задач)
     end_run_time = time.time()
     total_time = round(end_run_time - start_run_time)
 
@@ -403,4 +586,4 @@ ___________ _______   ____   __  _____  _   _  _____ _____  _   __ ___________
     sys.stdout.write('\x1b]2;Proxy Checker | Готово\x07')
     sys.stdout.flush()
 
-    sys.exit(0)
\ No newline at end of file
+    sys.exit(0)